@@ -0,0 +1,242 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from recipes.constants import (
+    REFERENCE_CACHE_TTL,
+    RESPONSE_CACHE_LOCK_TIMEOUT,
+    RESPONSE_CACHE_STALE_TTL,
+    RESPONSE_CACHE_TTL,
+    SHORT_LINK_CACHE_SIZE,
+    TOKEN_CACHE_SIZE,
+    TOKEN_CACHE_TTL
+)
+from recipes.indexes import IngredientIndex
+from recipes.models import Ingredient, Recipe, Tag
+from .serializers import IngredientSerializer, TagSerializer
+
+
+class ReferenceDataCache:
+    """Сериализованный справочник в памяти процесса с версией содержимого."""
+
+    def __init__(self, model, serializer_class, index_class=None,
+                 ttl=REFERENCE_CACHE_TTL):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.index_class = index_class
+        self.ttl = ttl
+        self._state = None
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._state = None
+
+    def _build(self):
+        payload = self.serializer_class(
+            self.model.objects.order_by('pk'), many=True
+        ).data
+        payload = [dict(item) for item in payload]
+        version = hashlib.sha1(json.dumps(
+            payload, ensure_ascii=False, sort_keys=True
+        ).encode('utf-8')).hexdigest()[:16]
+        self._state = {
+            'payload': payload,
+            'by_id': {item['id']: item for item in payload},
+            'version': version,
+            'index': self.index_class(payload) if self.index_class else None,
+        }
+        self._built_at = time.monotonic()
+
+    def snapshot(self):
+        """Справочник, индекс и версия из одной сборки."""
+        return self._get_state()
+
+    def _get_state(self):
+        if (self._state is None
+                or time.monotonic() - self._built_at > self.ttl):
+            with self._lock:
+                if (self._state is None
+                        or time.monotonic() - self._built_at > self.ttl):
+                    self._build()
+        return self._state
+
+    @property
+    def version(self):
+        return self._get_state()['version']
+
+    def all(self):
+        return self._get_state()['payload']
+
+    def get(self, pk):
+        return self._get_state()['by_id'].get(pk)
+
+    def values_for(self, field, values):
+        values = set(values)
+        return [item for item in self.all() if item[field] in values]
+
+
+class ShortLinkCache:
+    """LRU коротких ссылок: short_link -> pk рецепта."""
+
+    def __init__(self, maxsize=SHORT_LINK_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._links = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, short_link):
+        with self._lock:
+            if short_link in self._links:
+                self._links.move_to_end(short_link)
+                return self._links[short_link]
+        pk = Recipe.objects.filter(
+            short_link=short_link).values_list('pk', flat=True).first()
+        if pk is not None:
+            with self._lock:
+                self._links[short_link] = pk
+                if len(self._links) > self.maxsize:
+                    self._links.popitem(last=False)
+        return pk
+
+    def invalidate(self, recipe):
+        with self._lock:
+            self._links.pop(recipe.short_link, None)
+            for short_link, pk in list(self._links.items()):
+                if pk == recipe.pk:
+                    del self._links[short_link]
+
+
+class TokenCache:
+    """LRU токенов с временем жизни: ключ токена -> пользователь."""
+
+    def __init__(self, maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._tokens[key]
+                return None
+            self._tokens.move_to_end(key)
+        return copy.copy(user)
+
+    def set(self, key, user):
+        with self._lock:
+            self._tokens[key] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._tokens.move_to_end(key)
+            if len(self._tokens) > self.maxsize:
+                self._tokens.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._tokens.pop(key, None)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key, (_, user) in list(self._tokens.items()):
+                if user.pk == user_id:
+                    del self._tokens[key]
+
+
+class ResponseCache:
+    """Кеш ответов для анонимных запросов с защитой от «давки».
+
+    Ключ содержит версию, которую сигналы увеличивают при изменении данных.
+    Устаревший ответ отдаётся, пока один запрос строит новый.
+    С LocMemCache по умолчанию блокировка действует только внутри
+    процесса: каждый воркер строит ответ сам.
+    """
+
+    def __init__(self, prefix, ttl=RESPONSE_CACHE_TTL,
+                 stale_ttl=RESPONSE_CACHE_STALE_TTL,
+                 lock_timeout=RESPONSE_CACHE_LOCK_TIMEOUT):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self.version_key = f'{prefix}:version'
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            version = int(time.time() * 1000)
+            if not cache.add(self.version_key, version, None):
+                version = cache.get(self.version_key, version)
+        return version
+
+    def bump_version(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, int(time.time() * 1000), None)
+
+    def make_key(self, request, view_name):
+        query = urlencode(sorted(
+            (name, value)
+            for name in request.query_params
+            for value in request.query_params.getlist(name)
+        ))
+        raw_key = (f'{request.get_host()}:{request.accepted_renderer.format}:'
+                   f'{view_name}:{query}')
+        return '{}:{}:{}'.format(
+            self.prefix,
+            self.get_version(),
+            hashlib.md5(raw_key.encode('utf-8')).hexdigest()
+        )
+
+    def get_response(self, request, view_name, build):
+        key = self.make_key(request, view_name)
+        lock_key = f'{key}:lock'
+        entry = cache.get(key)
+        if entry is not None and entry[0] > time.time():
+            return self.cached_response(entry, 'HIT')
+        locked = cache.add(lock_key, 1, self.lock_timeout)
+        if not locked:
+            if entry is not None:
+                return self.cached_response(entry, 'STALE')
+            deadline = time.time() + self.lock_timeout
+            while time.time() < deadline:
+                time.sleep(0.05)
+                entry = cache.get(key)
+                if entry is not None:
+                    return self.cached_response(entry, 'HIT')
+            # Строим без блокировки, но чужую блокировку не снимаем.
+            locked = cache.add(lock_key, 1, self.lock_timeout)
+        try:
+            response = build()
+            if response.status_code == 200:
+                cache.set(key, (time.time() + self.ttl, response.data),
+                          self.ttl + self.stale_ttl)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    @staticmethod
+    def cached_response(entry, state):
+        response = Response(entry[1])
+        response['X-Cache'] = state
+        return response
+
+
+tag_cache = ReferenceDataCache(Tag, TagSerializer)
+ingredient_cache = ReferenceDataCache(
+    Ingredient, IngredientSerializer, IngredientIndex)
+short_link_cache = ShortLinkCache()
+token_cache = TokenCache()
+recipe_response_cache = ResponseCache('recipes')
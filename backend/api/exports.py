@@ -0,0 +1,62 @@
+import csv
+import json
+
+from django.utils.timezone import now
+
+
+class Echo:
+
+    def write(self, value):
+        return value
+
+
+def shopping_list_text(user, ingredients):
+    today = now().date()
+    yield (
+        f'Список покупок для: {user.get_full_name()}\n\n'
+        f'Дата: {today:%Y-%m-%d}\n\n'
+    )
+    separator = ''
+    for ingredient in ingredients:
+        yield (
+            f'{separator}- {ingredient["ingredient__name"]} '
+            f'({ingredient["ingredient__measurement_unit"]})'
+            f' - {ingredient["amount"]}'
+        )
+        separator = '\n'
+    yield f'\n\nFoodgram ({today:%Y})'
+
+
+def shopping_list_csv(user, ingredients):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'measurement_unit', 'amount'))
+    for ingredient in ingredients:
+        yield writer.writerow((
+            ingredient['ingredient__name'],
+            ingredient['ingredient__measurement_unit'],
+            ingredient['amount'],
+        ))
+
+
+def shopping_list_json(user, ingredients):
+    header = json.dumps({
+        'user': user.get_full_name(),
+        'date': f'{now().date():%Y-%m-%d}',
+    }, ensure_ascii=False)
+    yield header[:-1] + ', "ingredients": ['
+    separator = ''
+    for ingredient in ingredients:
+        yield separator + json.dumps({
+            'name': ingredient['ingredient__name'],
+            'measurement_unit': ingredient['ingredient__measurement_unit'],
+            'amount': ingredient['amount'],
+        }, ensure_ascii=False)
+        separator = ', '
+    yield ']}'
+
+
+SHOPPING_LIST_FORMATS = {
+    'txt': (shopping_list_text, 'text/plain; charset=utf-8'),
+    'csv': (shopping_list_csv, 'text/csv; charset=utf-8'),
+    'json': (shopping_list_json, 'application/json'),
+}
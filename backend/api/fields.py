@@ -1,17 +1,127 @@
 import base64
-import uuid
+import binascii
+import hashlib
+import re
 
-from django.core.files.base import ContentFile
+from django.apps import apps
+from django.core.files.uploadedfile import TemporaryUploadedFile
 from rest_framework import serializers
 
+from core.images import IMAGE_VARIANTS, get_variant_name, ready_variants
+from recipes.constants import IMAGE_MAX_SIZE
+
+BASE64_MARKER = ';base64,'
+BASE64_CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r'\s+')
+
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+
+
+class DecodedImageFile(TemporaryUploadedFile):
+
+    def __del__(self):
+        # Хранилище могло уже переместить файл: close() это учитывает.
+        self.close()
+
+
+def iter_base64_chunks(data, start):
+    """Декодирует base64 по частям, пропуская переводы строк и пробелы."""
+    pending = ''
+    for offset in range(start, len(data), BASE64_CHUNK_SIZE):
+        pending += WHITESPACE.sub('', data[offset:offset + BASE64_CHUNK_SIZE])
+        size = len(pending) // 4 * 4
+        if size:
+            yield base64.b64decode(pending[:size], validate=True)
+            pending = pending[size:]
+    if pending:
+        yield base64.b64decode(pending, validate=True)
+
+
+def sniff_image_extension(header):
+    for signature, extension in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
 
 class Base64ImageField(serializers.ImageField):
+    default_error_messages = {
+        'invalid_base64': 'Некорректные данные изображения!',
+        'too_large': 'Размер изображения не должен превышать '
+                     '{max_size} байт!',
+        'unsupported': 'Поддерживаются только PNG, JPEG, GIF и WEBP!',
+    }
 
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
-            ext = format.split('/')[-1]
-            img_data = base64.b64decode(imgstr)
-            file_name = f'{uuid.uuid4()}.{ext}'
-            data = ContentFile(img_data, name=file_name)
+            data = self.decode(data)
         return super().to_internal_value(data)
+
+    def decode(self, data):
+        start = data.find(BASE64_MARKER)
+        if start == -1:
+            self.fail('invalid_base64')
+        start += len(BASE64_MARKER)
+        if (len(data) - start) // 4 * 3 > IMAGE_MAX_SIZE:
+            self.fail('too_large', max_size=IMAGE_MAX_SIZE)
+        file = DecodedImageFile('image', None, 0, None)
+        digest = hashlib.sha256()
+        extension = None
+        try:
+            for chunk in iter_base64_chunks(data, start):
+                if extension is None:
+                    extension = sniff_image_extension(chunk)
+                    if extension is None:
+                        self.fail('unsupported')
+                digest.update(chunk)
+                file.write(chunk)
+        except binascii.Error:
+            file.close()
+            self.fail('invalid_base64')
+        except serializers.ValidationError:
+            file.close()
+            raise
+        if extension is None:
+            file.close()
+            self.fail('invalid_base64')
+        file.size = file.tell()
+        file.seek(0)
+        file.name = f'{digest.hexdigest()}.{extension}'
+        file.content_type = f'image/{extension}'
+        return file
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Ссылки на уменьшенные копии; пока копии нет - на оригинал."""
+
+    def __init__(self, model, field, **kwargs):
+        self.image_model = model
+        self.image_field = field
+        self.variants = IMAGE_VARIANTS[(model, field)]
+        kwargs['source'] = field
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        storage = value.storage
+        default = apps.get_model(self.image_model)._meta.get_field(
+            self.image_field).default
+        urls = {}
+        for variant in self.variants:
+            name = get_variant_name(value.name, variant)
+            if value.name == default or not ready_variants.exists(
+                    storage, name):
+                name = value.name
+            url = storage.url(name)
+            urls[variant] = (
+                request.build_absolute_uri(url) if request else url)
+        return urls
@@ -1,6 +1,17 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters, FilterSet
 
-from recipes.models import Ingredient, Tag, Recipe
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingListItem
+from recipes.search import search_recipes
+from .caches import tag_cache
+
+
+def get_tag_choices():
+    return [(tag['slug'], tag['name']) for tag in tag_cache.all()]
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
 
 
 class IngredientFilter(filters.FilterSet):
@@ -12,27 +23,45 @@ class IngredientFilter(filters.FilterSet):
 
 
 class RecipeFilter(FilterSet):
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        to_field_name='slug',
-        queryset=Tag.objects.all(),
+    tags = filters.MultipleChoiceFilter(
+        choices=get_tag_choices,
+        method='filter_tags',
     )
+    author = filters.NumberFilter(field_name='author_id')
+    authors = NumberInFilter(field_name='author_id')
+    cooking_time = filters.RangeFilter()
+    search = filters.CharFilter(method='filter_search')
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart')
+    ordering = filters.OrderingFilter(fields=(
+        ('favorites_count', 'popularity'),
+        ('created_at', 'created_at'),
+        ('cooking_time', 'cooking_time'),
+    ))
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'author',)
+        fields = ('tags', 'author', 'authors', 'cooking_time', 'search')
+
+    def filter_tags(self, queryset, name, value):
+        tag_ids = [tag['id'] for tag in tag_cache.values_for('slug', value)]
+        return queryset.filter(Exists(Recipe.tags.through.objects.filter(
+            recipe_id=OuterRef('pk'), tag_id__in=tag_ids)))
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
 
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
         if value and user.is_authenticated:
-            return queryset.filter(favorites__user=user)
+            return queryset.filter(Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk'))))
         return queryset
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         user = self.request.user
         if value and user.is_authenticated:
-            return queryset.filter(shoppinglistitems__user=user)
+            return queryset.filter(Exists(ShoppingListItem.objects.filter(
+                user=user, recipe=OuterRef('pk'))))
         return queryset
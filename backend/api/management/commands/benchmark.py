@@ -0,0 +1,164 @@
+import base64
+import io
+import json
+import tempfile
+from time import perf_counter
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from core.metrics import percentile
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+QUERY_BUDGETS = {
+    'recipe_list': 8,
+    'recipe_detail': 7,
+    'subscriptions': 8,
+    'ingredient_search': 1,
+    'download_shopping_cart': 4,
+    'recipe_create': 23,
+    'recipe_update': 25,
+}
+
+
+def make_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), 'orange').save(buffer, 'PNG')
+    return ('data:image/png;base64,'
+            + base64.b64encode(buffer.getvalue()).decode())
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержки и число SQL-запросов основных эндпоинтов '
+            'на тестовой базе с синтетическими данными.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--recipes', type=int, default=500)
+        parser.add_argument('--ingredients', type=int, default=300)
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Сохранить отчёт JSON в файл.')
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не пересоздавать тестовую базу.')
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            with tempfile.TemporaryDirectory() as media_root, \
+                    override_settings(MEDIA_ROOT=media_root):
+                report = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb'])
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        self.stdout.write(output)
+        failed = [
+            name for name, result in report['endpoints'].items()
+            if not result['within_budget']
+        ]
+        if failed:
+            raise CommandError(
+                f'Превышен бюджет запросов: {", ".join(failed)}')
+
+    def seed(self, options):
+        call_command(
+            'seed_data', users=options['users'], recipes=options['recipes'],
+            ingredients=options['ingredients'], tags=3,
+            ingredients_per_recipe=5, follows_per_user=options['page_size'],
+            favorites_per_user=5, cart_per_user=20, seed=options['seed'],
+            stdout=io.StringIO()
+        )
+        return (
+            User.objects.order_by('pk').first(),
+            list(Tag.objects.order_by('pk')),
+            list(Ingredient.objects.order_by('pk')
+                 .values_list('pk', flat=True))
+        )
+
+    def run(self, options):
+        user, tags, ingredients = self.seed(options)
+        client = APIClient()
+        client.force_authenticate(user)
+        image = make_image()
+        page = options['page_size']
+        own_recipe = {}
+
+        def recipe_payload(name):
+            return {
+                'name': name, 'text': 'Описание', 'cooking_time': 10,
+                'image': image, 'tags': [tags[0].pk],
+                'ingredients': [
+                    {'id': ingredient, 'amount': 10}
+                    for ingredient in ingredients[:5]
+                ],
+            }
+
+        def create():
+            response = client.post(
+                '/api/recipes/', recipe_payload('Новый'), format='json')
+            own_recipe.setdefault('id', response.json().get('id'))
+            return response
+
+        def update():
+            if 'id' not in own_recipe:
+                create()
+            return client.patch(
+                f'/api/recipes/{own_recipe["id"]}/',
+                recipe_payload('Обновлённый'), format='json')
+
+        detail_id = Recipe.objects.values_list('pk', flat=True).first()
+        endpoints = {
+            'recipe_list': lambda: client.get(
+                f'/api/recipes/?limit={page}&tags={tags[0].slug}'
+                f'&tags={tags[1].slug}'),
+            'recipe_detail': lambda: client.get(
+                f'/api/recipes/{detail_id}/'),
+            'subscriptions': lambda: client.get(
+                f'/api/users/subscriptions/?limit={page}&recipes_limit=3'),
+            'ingredient_search': lambda: client.get(
+                '/api/ingredients/?name=ингр'),
+            'download_shopping_cart': lambda: b''.join(client.get(
+                '/api/recipes/download_shopping_cart/').streaming_content),
+            'recipe_create': create,
+            'recipe_update': update,
+        }
+        results = {}
+        for name, request in endpoints.items():
+            request()
+            timings, queries = [], []
+            for _ in range(options['iterations']):
+                with CaptureQueriesContext(connection) as context:
+                    start = perf_counter()
+                    request()
+                    timings.append((perf_counter() - start) * 1000)
+                queries.append(len(context))
+            budget = QUERY_BUDGETS[name]
+            results[name] = {
+                'p50_ms': round(percentile(timings, 50), 2),
+                'p95_ms': round(percentile(timings, 95), 2),
+                'p99_ms': round(percentile(timings, 99), 2),
+                'queries': max(queries),
+                'query_budget': budget,
+                'within_budget': max(queries) <= budget,
+            }
+        return {
+            'database': connection.vendor,
+            'scale': {
+                key: options[key]
+                for key in ('users', 'recipes', 'ingredients', 'iterations')
+            },
+            'endpoints': results,
+        }
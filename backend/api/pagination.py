@@ -1,6 +1,75 @@
-from rest_framework.pagination import PageNumberPagination
+from collections import OrderedDict
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from core.pagination import estimate_count
+
+
+class ProjectCursorPagination(CursorPagination):
+    page_size = 6
+    page_size_query_param = 'limit'
+    ordering = ('-pk',)
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        """Порядок из ?ordering с id для равных значений.
+
+        Порядок по рангу поиска не годится для курсора: отвечаем 400,
+        а не подменяем его другим.
+        """
+        ordering = tuple(queryset.query.order_by)
+        if not ordering:
+            return tuple(getattr(view, 'cursor_ordering', self.ordering))
+        fields = {field.name for field in queryset.model._meta.concrete_fields}
+        fields.add('pk')
+        if any(name.lstrip('-') not in fields for name in ordering):
+            raise ValidationError({'pagination': (
+                'Курсорная пагинация недоступна для этого порядка, '
+                'используйте постраничную.'
+            )})
+        if not {'pk', 'id'} & {name.lstrip('-') for name in ordering}:
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param) == 'estimate':
+            self.count = estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
 
 
 class ProjectPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+    mode_query_param = 'pagination'
+
+    def is_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or ProjectCursorPagination.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.is_cursor_mode(request):
+            self.cursor_paginator = ProjectCursorPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
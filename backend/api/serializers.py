@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from rest_framework.fields import SerializerMethodField
-from django.db.models import F
+from django.db.models import Prefetch, prefetch_related_objects
 from django.db.transaction import atomic
 
+from core.timing import TimedSerializerMixin
 from users.models import User, Follow
 from recipes.models import (
     Tag,
@@ -12,41 +13,48 @@ from recipes.models import (
     ShoppingListItem,
     RecipeIngredient
 )
+from recipes.shopping_lists import replacing_recipe_ingredients
 from recipes.constants import (
     AMOUNT_MIN,
     AMOUNT_MAX
 )
-from .fields import Base64ImageField
+from .fields import Base64ImageField, ImageVariantsField
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         fields = '__all__'
         model = Tag
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         fields = '__all__'
         model = Ingredient
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     avatar = Base64ImageField(required=False, allow_null=True)
+    avatar_variants = ImageVariantsField('users.User', 'avatar')
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = ('email', 'id', 'username', 'first_name',
-                  'last_name', 'is_subscribed', 'avatar')
+                  'last_name', 'is_subscribed', 'avatar', 'avatar_variants')
         read_only_fields = ('is_subscribed',)
 
     def get_is_subscribed(self, obj):
-        request = self.context['request']
-        return (
-            request.user.is_authenticated
-            and request.user.followers.filter(following=obj).exists()
-        )
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        user = self.context['request'].user
+        if not user.is_authenticated:
+            return False
+        if 'subscribed_ids' not in self.context:
+            self.context['subscribed_ids'] = set(
+                user.followers.values_list('following_id', flat=True)
+            )
+        return obj.id in self.context['subscribed_ids']
 
 
 class RecipeIngredientSerializer(serializers.ModelSerializer):
@@ -61,8 +69,20 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         model = RecipeIngredient
 
 
-class RecipeShortSerializer(serializers.ModelSerializer):
+class RecipeIngredientShowSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='ingredient.id')
+    name = serializers.CharField(source='ingredient.name')
+    measurement_unit = serializers.CharField(
+        source='ingredient.measurement_unit')
+
+    class Meta:
+        fields = ('id', 'name', 'measurement_unit', 'amount')
+        model = RecipeIngredient
+
+
+class RecipeShortSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     image = Base64ImageField()
+    image_variants = ImageVariantsField('recipes.Recipe', 'image')
 
     class Meta:
         model = Recipe
@@ -70,6 +90,7 @@ class RecipeShortSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'image',
+            'image_variants',
             'cooking_time'
         )
         read_only_fields = (
@@ -80,11 +101,13 @@ class RecipeShortSerializer(serializers.ModelSerializer):
         )
 
 
-class RecipeShowSerializer(serializers.ModelSerializer):
+class RecipeShowSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     author = UserSerializer(read_only=True)
     image = Base64ImageField()
-    ingredients = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField('recipes.Recipe', 'image')
+    ingredients = RecipeIngredientShowSerializer(
+        source='recipeingredient', many=True, read_only=True)
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
 
@@ -99,32 +122,16 @@ class RecipeShowSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_variants',
             'text',
             'cooking_time',
         )
 
-    def get_ingredients(self, obj):
-        ingredients = obj.ingredients.values(
-            'id',
-            'name',
-            'measurement_unit',
-            amount=F('recipeingredient__amount')
-        )
-        return ingredients
-
     def get_is_favorited(self, obj):
-        user = self.context['request'].user
-        return (
-            user.is_authenticated
-            and user.favorites.filter(recipe=obj).exists()
-        )
+        return getattr(obj, 'is_favorited', False)
 
     def get_is_in_shopping_cart(self, obj):
-        user = self.context['request'].user
-        return (
-            user.is_authenticated
-            and user.shoppinglistitems.filter(recipe=obj).exists()
-        )
+        return getattr(obj, 'is_in_shopping_cart', False)
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
@@ -203,14 +210,24 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         instance.tags.set(self.validate_tags(validated_data.pop('tags', [])))
 
-        RecipeIngredient.objects.filter(recipe=instance).delete()
-        self.create_ingredients(
-            self.validate_ingredients(validated_data.pop('ingredients', [])),
-            instance
-        )
+        with replacing_recipe_ingredients(instance.pk):
+            RecipeIngredient.objects.filter(recipe=instance).delete()
+            self.create_ingredients(
+                self.validate_ingredients(
+                    validated_data.pop('ingredients', [])),
+                instance
+            )
         return super().update(instance, validated_data)
 
     def to_representation(self, instance):
+        prefetch_related_objects(
+            (instance,),
+            'tags',
+            Prefetch(
+                'recipeingredient',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            )
+        )
         return RecipeShowSerializer(instance, context=self.context).data
 
 
@@ -228,6 +245,7 @@ class FollowShowSerializer(UserSerializer):
             'last_name',
             'is_subscribed',
             'avatar',
+            'avatar_variants',
             'recipes',
             'recipes_count'
         )
@@ -240,14 +258,10 @@ class FollowShowSerializer(UserSerializer):
         )
 
     def get_recipes(self, obj):
-        request = self.context['request']
-        limit = request.query_params.get('recipes_limit')
+        limit = self.context.get('recipes_limit')
         recipes = obj.recipes.all()
         if limit:
-            try:
-                recipes = recipes[:int(limit)]
-            except ValueError:
-                pass
+            recipes = recipes[:limit]
         return RecipeShortSerializer(
             recipes, many=True, context=self.context
         ).data
@@ -310,7 +324,7 @@ class ShoppingListItemSerializer(BaseRecipeRelationSerializer):
         fields = ('user', 'recipe',)
 
 
-class AvatarSerializer(serializers.ModelSerializer):
+class AvatarSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     avatar = Base64ImageField(allow_null=True)
 
     class Meta:
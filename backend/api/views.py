@@ -1,16 +1,21 @@
-import io
+import hashlib
+from functools import partial
 from http import HTTPStatus
 
-from django.db.models import Count
+from django.db.models import (
+    BooleanField, Exists, OuterRef, Prefetch, Subquery, Value
+)
 from djoser.views import UserViewSet as DjoserUserViewSet
-from django.utils.timezone import now
 from django.shortcuts import redirect
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum
-from django.http import FileResponse, HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import parse_etags
+from django.views.decorators.http import require_safe
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework import viewsets, status
 from rest_framework.permissions import SAFE_METHODS, IsAuthenticated, AllowAny
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
 from recipes.models import (
@@ -33,29 +38,81 @@ from .serializers import (
     AvatarSerializer,
     UserSerializer
 )
+from .exports import SHOPPING_LIST_FORMATS
+from .caches import (
+    ingredient_cache,
+    recipe_response_cache,
+    short_link_cache,
+    tag_cache
+)
 from .permissions import IsAuthorOrReadOnly
 from .filters import IngredientFilter, RecipeFilter
+from .negotiation import IgnoreFormatContentNegotiation
 from .pagination import ProjectPagination
+from core.tasks import enqueue
 from recipes.constants import SITE_URL
 from users.models import User, Follow
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class ReferenceDataMixin:
+    reference_cache = None
+
+    def get_reference_response(self, request, get_data, state=None):
+        state = state or self.reference_cache.snapshot()
+        version = state['version']
+        etag = '"{}"'.format(hashlib.md5(
+            f'{version}:{request.accepted_renderer.format}:'
+            f'{request.get_full_path()}'.encode('utf-8')
+        ).hexdigest())
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(get_data(state))
+        response['ETag'] = etag
+        response['X-Content-Version'] = version
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_reference_response(
+            request, lambda state: state['payload'])
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = self.kwargs['pk']
+        state = self.reference_cache.snapshot()
+        item = state['by_id'].get(int(pk)) if pk.isdigit() else None
+        if item is None:
+            raise NotFound
+        return self.get_reference_response(
+            request, lambda state: item, state)
+
+
+class TagViewSet(ReferenceDataMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    reference_cache = tag_cache
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(ReferenceDataMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
+    reference_cache = ingredient_cache
+
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name:
+            return self.get_reference_response(
+                request, lambda state: state['index'].search(name))
+        return super().list(request, *args, **kwargs)
 
 
 class UserViewSet(DjoserUserViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     pagination_class = ProjectPagination
+    cursor_ordering = ('id',)
 
     def get_permissions(self):
         if self.action == 'me':
@@ -72,7 +129,10 @@ class UserViewSet(DjoserUserViewSet):
         author_id = self.kwargs.get('id')
         data = {'user': user.id, 'following': author_id}
         serializer = FollowCreateSerializer(
-            data=data, context={'request': request})
+            data=data, context={
+                'request': request,
+                'recipes_limit': self.get_recipes_limit()
+            })
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -96,13 +156,35 @@ class UserViewSet(DjoserUserViewSet):
     )
     def subscriptions(self, request):
         user = request.user
+        limit = self.get_recipes_limit()
+        recipes = Recipe.objects.all()
+        if limit:
+            recipes = recipes.filter(pk__in=Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('author')
+                ).values('pk')[:limit]
+            ))
         queryset = User.objects.filter(followings__user=user).annotate(
-            recipes_count=Count('recipes'))
+            is_subscribed=Value(True, output_field=BooleanField())
+        ).prefetch_related(Prefetch('recipes', queryset=recipes))
         pages = self.paginate_queryset(queryset)
         serializer = FollowShowSerializer(
-            pages, many=True, context={'request': request})
+            pages, many=True, context={
+                'request': request,
+                'recipes_limit': limit
+            })
         return self.get_paginated_response(serializer.data)
 
+    def get_recipes_limit(self):
+        limit = self.request.query_params.get('recipes_limit')
+        if limit is None:
+            return None
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValidationError(
+                {'recipes_limit': 'Укажите целое положительное число!'}
+            )
+        return int(limit)
+
     @action(
         detail=False,
         methods=('put',),
@@ -126,26 +208,62 @@ class UserViewSet(DjoserUserViewSet):
     def remove_avatar(self, request):
         user = request.user
         if user.avatar:
-            user.avatar.delete()
-            user.save()
+            name = user.avatar.name
+            user.avatar = None
+            user.save(update_fields=('avatar',))
+            enqueue('delete_unreferenced_file', key=f'delete:{name}',
+                    name=name)
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response({'error': 'Нет картинки для удаления!'},
                         status=status.HTTP_400_BAD_REQUEST)
 
 
 class RecipeViewSet(viewsets.ModelViewSet):
-    queryset = Recipe.objects.select_related(
-        'author').prefetch_related('tags', 'ingredients')
+    queryset = Recipe.objects.defer('search_vector').select_related(
+        'author'
+    ).prefetch_related(
+        'tags',
+        Prefetch(
+            'recipeingredient',
+            queryset=RecipeIngredient.objects.select_related('ingredient')
+        )
+    )
     permission_classes = (IsAuthorOrReadOnly,)
     pagination_class = ProjectPagination
+    cursor_ordering = ('-created_at', '-id')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset
+        return queryset.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+            is_in_shopping_cart=Exists(ShoppingListItem.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+        )
+
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
             return RecipeShowSerializer
         return RecipeCreateSerializer
 
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        return recipe_response_cache.get_response(
+            request, 'list', partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().retrieve(request, *args, **kwargs)
+        return recipe_response_cache.get_response(
+            request, f'retrieve:{kwargs["pk"]}',
+            partial(super().retrieve, request, *args, **kwargs))
+
     @staticmethod
     def add_to_list(serializer_class, pk, request):
         user = request.user
@@ -189,47 +307,39 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return Response({'errors': 'Рецепта нет в списке!'},
                         status=status.HTTP_400_BAD_REQUEST)
 
-    @staticmethod
-    def create_shopping_list(user, ingredients):
-        today = now().date()
-        shopping_list = (
-            f'Список покупок для: {user.get_full_name()}\n\n'
-            f'Дата: {today:%Y-%m-%d}\n\n'
-        )
-        shopping_list += '\n'.join([
-            f'- {ingredient["ingredient__name"]} '
-            f'({ingredient["ingredient__measurement_unit"]})'
-            f' - {ingredient["amount"]}'
-            for ingredient in ingredients
-        ])
-        shopping_list += f'\n\nFoodgram ({today:%Y})'
-        return shopping_list
-
     @action(detail=False, methods=('get',),
             permission_classes=(IsAuthenticated,),
+            renderer_classes=(JSONRenderer,),
+            content_negotiation_class=IgnoreFormatContentNegotiation,
             url_path='download_shopping_cart')
     def download_shopping_cart(self, request):
         user = request.user
+        export_format = request.query_params.get('format', 'txt')
+        if export_format not in SHOPPING_LIST_FORMATS:
+            return Response(
+                {'errors': 'Доступные форматы: '
+                           f'{", ".join(SHOPPING_LIST_FORMATS)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         if not user.shoppinglistitems.exists():
             return Response({'errors': 'Список покупок пуст!'},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        ingredients = RecipeIngredient.objects.filter(
-            recipe__shoppinglistitems__user=user
-        ).values(
+        ingredients = user.shoppinglistingredients.values(
             'ingredient__name',
-            'ingredient__measurement_unit'
-        ).annotate(amount=Sum('amount')).order_by('ingredient__name')
+            'ingredient__measurement_unit',
+            'amount'
+        ).order_by('ingredient__name')
 
-        shopping_list = self.create_shopping_list(user, ingredients)
-
-        buffer = io.BytesIO()
-        buffer.write(shopping_list.encode('utf-8'))
-        buffer.seek(0)
-
-        response = FileResponse(buffer, content_type='text/plain')
+        export, content_type = SHOPPING_LIST_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            (chunk.encode('utf-8')
+             for chunk in export(user, ingredients.iterator())),
+            content_type=content_type
+        )
         response['Content-Disposition'] = (
-            f'attachment; filename={user.username}_shopping_list.txt'
+            f'attachment; filename={user.username}_shopping_list.'
+            f'{export_format}'
         )
         return response
 
@@ -243,9 +353,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
             short_link = f'{SITE_URL}/s/{recipe.short_link}'
             return Response({'short-link': short_link},
                             status=status.HTTP_200_OK)
-        else:
-            try:
-                recipe = Recipe.objects.get(short_link=short_hash)
-                return redirect(f'{SITE_URL}/recipes/{recipe.pk}/')
-            except Recipe.DoesNotExist:
-                return HttpResponse(status=HTTPStatus.NOT_FOUND)
+        return redirect_short_link(request, short_hash)
+
+
+@require_safe
+def redirect_short_link(request, short_hash):
+    pk = short_link_cache.resolve(short_hash)
+    if pk is None:
+        return HttpResponse(status=HTTPStatus.NOT_FOUND)
+    return redirect(f'{SITE_URL}/recipes/{pk}/')
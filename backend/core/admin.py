@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import Task
+from .pagination import EstimatedCountPaginator
+
+
+class LargeTableAdminMixin:
+    """Списки без полного COUNT(*) для больших таблиц."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Task)
+class TaskAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_at', 'updated_at')
+    list_filter = ('status', 'name')
+    search_fields = ('key',)
@@ -0,0 +1,102 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FORMAT = 'webp'
+VARIANT_QUALITY = 80
+VARIANT_CACHE_SIZE = 10000
+
+IMAGE_VARIANTS = {
+    ('recipes.Recipe', 'image'): {
+        'card': (640, 480),
+        'thumb': (320, 240),
+    },
+    ('users.User', 'avatar'): {
+        'avatar': (160, 160),
+    },
+}
+
+
+def get_variant_name(name, variant):
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(
+        directory, 'variants', f'{stem}_{variant}.{VARIANT_FORMAT}')
+
+
+class ReadyVariants:
+    """LRU уже созданных копий, чтобы не проверять хранилище каждый раз.
+
+    Запоминаются только найденные файлы: отсутствующая копия может
+    появиться, когда обработчик задач её создаст.
+    """
+
+    def __init__(self, maxsize=VARIANT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._names = OrderedDict()
+        self._lock = threading.Lock()
+
+    def exists(self, storage, name):
+        with self._lock:
+            if name in self._names:
+                self._names.move_to_end(name)
+                return True
+        if not storage.exists(name):
+            return False
+        with self._lock:
+            self._names[name] = True
+            if len(self._names) > self.maxsize:
+                self._names.popitem(last=False)
+        return True
+
+    def discard(self, name):
+        with self._lock:
+            self._names.pop(name, None)
+
+
+ready_variants = ReadyVariants()
+
+
+def fit_size(image, size):
+    """Размер копии с пропорциями size, но не больше оригинала."""
+    width, height = size
+    scale = min(image.width / width, image.height / height, 1)
+    return max(round(width * scale), 1), max(round(height * scale), 1)
+
+
+def generate_variants(file, variants):
+    """Создаёт недостающие уменьшенные копии изображения в WEBP."""
+    if not file:
+        return 0
+    storage = file.storage
+    missing = {
+        variant: size for variant, size in variants.items()
+        if not storage.exists(get_variant_name(file.name, variant))
+    }
+    if not missing:
+        return 0
+    try:
+        with storage.open(file.name) as original:
+            image = Image.open(original)
+            image.load()
+    except (OSError, ValueError) as e:
+        logger.warning('Не удалось открыть %s: %s', file.name, e)
+        return 0
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    for variant, size in missing.items():
+        buffer = BytesIO()
+        ImageOps.fit(image, fit_size(image, size), Image.LANCZOS).save(
+            buffer, VARIANT_FORMAT, quality=VARIANT_QUALITY)
+        storage.save(
+            get_variant_name(file.name, variant),
+            ContentFile(buffer.getvalue())
+        )
+    return len(missing)
@@ -0,0 +1,210 @@
+import json
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.metrics import histogram, percentile
+from recipes.management.commands.seed_data import SEED_PASSWORD
+
+ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+SHORT_LINK_SEGMENT = re.compile(r'^/s/[^/]+')
+
+
+def route_of(method, path):
+    path = SHORT_LINK_SEGMENT.sub('/s/{short_link}', path)
+    return f'{method} {ID_SEGMENT.sub("/{id}", path)}'
+
+
+def read_log(filename, limit):
+    with open(filename, encoding='utf-8') as file:
+        count = 0
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict) or 'path' not in record:
+                raise ValueError(f'запись без пути: {line.strip()}')
+            yield record
+            count += 1
+            if limit and count >= limit:
+                return
+
+
+class Replayer:
+    def __init__(self, base_url, password, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.password = password
+        self.timeout = timeout
+        self.tokens = {}
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+        self.server_errors = Counter()
+        self.login_failures = {}
+
+    def send(self, method, path, query=None, body=None, token=None):
+        url = self.base_url + path
+        if query:
+            url += '?' + urlencode(query, doseq=True)
+        headers = {}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Token {token}'
+        request = Request(url, data=data, headers=headers, method=method)
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except HTTPError as error:
+            return error.code, error.read()
+
+    def get_token(self, email):
+        with self.lock:
+            if email in self.tokens:
+                return self.tokens[email]
+        status, content = self.send(
+            'POST', '/api/auth/token/login/',
+            body={'email': email, 'password': self.password})
+        token = json.loads(content)['auth_token'] if status == 200 else None
+        with self.lock:
+            if token is None:
+                self.login_failures.setdefault(email, status)
+            return self.tokens.setdefault(email, token)
+
+    def count_error(self, route, status, server_error=True):
+        with self.lock:
+            self.statuses[route][status] += 1
+            self.errors[route] += 1
+            if server_error:
+                self.server_errors[route] += 1
+
+    def replay(self, record):
+        method = record.get('method', 'GET')
+        route = route_of(method, record['path'])
+        try:
+            token = self.get_token(record['user']) if record.get(
+                'user') else None
+            if record.get('user') and token is None:
+                # Анонимный повтор дал бы другую нагрузку и ответы 401.
+                self.count_error(route, 'login_failed', server_error=False)
+                return
+            start = time.perf_counter()
+            status, _ = self.send(
+                method, record['path'], record.get('query'),
+                record.get('body'), token)
+        except (URLError, OSError, ValueError) as error:
+            self.count_error(route, type(error).__name__)
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.timings[route].append(elapsed)
+            self.statuses[route][str(status)] += 1
+            if status >= 400:
+                self.errors[route] += 1
+            if status >= 500:
+                self.server_errors[route] += 1
+
+    def report(self, duration):
+        routes = {}
+        for route in sorted(self.statuses):
+            timings = self.timings[route]
+            requests = sum(self.statuses[route].values())
+            routes[route] = {
+                'requests': requests,
+                'rps': round(requests / duration, 2),
+                'error_rate': round(self.errors[route] / requests, 4),
+                'server_error_rate': round(
+                    self.server_errors[route] / requests, 4),
+                'statuses': dict(self.statuses[route]),
+                'p50_ms': round(percentile(timings, 50), 2)
+                if timings else None,
+                'p95_ms': round(percentile(timings, 95), 2)
+                if timings else None,
+                'p99_ms': round(percentile(timings, 99), 2)
+                if timings else None,
+                'histogram_ms': histogram(timings),
+            }
+        total = sum(route['requests'] for route in routes.values())
+        return {
+            'duration_s': round(duration, 2),
+            'requests': total,
+            'rps': round(total / duration, 2) if duration else None,
+            'error_rate': round(sum(self.errors.values()) / total, 4)
+            if total else None,
+            'server_error_rate': round(
+                sum(self.server_errors.values()) / total, 4)
+            if total else None,
+            'login_failures': self.login_failures,
+            'routes': routes,
+        }
+
+
+class Command(BaseCommand):
+    help = ('Воспроизводит журнал API-запросов в формате JSONL на '
+            'работающем бэкенде и считает задержки по маршрутам.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('log', help='Файл журнала запросов (JSONL).')
+        parser.add_argument(
+            '--base-url', default='http://localhost:8000')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument(
+            '--rate', type=float, default=0,
+            help='Запросов в секунду; 0 — без ограничения.')
+        parser.add_argument(
+            '--limit', type=int, default=0,
+            help='Воспроизвести не больше указанного числа запросов.')
+        parser.add_argument(
+            '--password', default=SEED_PASSWORD,
+            help='Пароль пользователей из журнала.')
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument(
+            '--output', help='Сохранить отчёт JSON в файл.')
+
+    def handle(self, *args, **options):
+        replayer = Replayer(
+            options['base_url'], options['password'], options['timeout'])
+        concurrency = options['concurrency']
+        interval = 1 / options['rate'] if options['rate'] > 0 else 0
+        in_flight = threading.BoundedSemaphore(concurrency * 2)
+
+        def run(record):
+            try:
+                replayer.replay(record)
+            finally:
+                in_flight.release()
+
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for index, record in enumerate(
+                        read_log(options['log'], options['limit'])):
+                    if interval:
+                        delay = start + index * interval - time.perf_counter()
+                        if delay > 0:
+                            time.sleep(delay)
+                    in_flight.acquire()
+                    executor.submit(run, record)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Ошибка чтения журнала: {error}')
+        report = replayer.report(time.perf_counter() - start)
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        self.stdout.write(output)
+        if replayer.login_failures:
+            raise CommandError(
+                'Не удалось войти за пользователей: '
+                + ', '.join(sorted(replayer.login_failures))
+                + '. Их запросы не воспроизведены.')
@@ -0,0 +1,61 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.tasks import (claim_tasks, delete_done_tasks, requeue_stale_tasks,
+                        run_task)
+
+CLEANUP_INTERVAL = 60
+
+
+def run_in_thread(pk):
+    close_old_connections()
+    try:
+        return run_task(pk)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчик фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--stale-after', type=int, default=600,
+            help='Через сколько секунд зависшая задача вернётся в очередь.'
+        )
+        parser.add_argument(
+            '--keep-done', type=int, default=86400,
+            help='Сколько секунд хранить выполненные задачи.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить задачи, готовые сейчас, и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработчик задач запущен, потоков: {workers}'))
+        cleaned_at = None
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                requeue_stale_tasks(options['stale_after'])
+                now = time.monotonic()
+                if cleaned_at is None or now - cleaned_at >= CLEANUP_INTERVAL:
+                    delete_done_tasks(options['keep_done'])
+                    cleaned_at = now
+                claimed = claim_tasks(workers * 2)
+                for task in executor.map(run_in_thread, claimed):
+                    self.stdout.write(f'{task}: попытка {task.attempts}')
+                if options['once'] and not claimed:
+                    return
+                if not claimed:
+                    time.sleep(options['poll_interval'])
@@ -0,0 +1,19 @@
+import math
+from bisect import bisect_left
+
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = max(math.ceil(percent / 100 * len(values)) - 1, 0)
+    return values[index]
+
+
+def histogram(values, buckets=HISTOGRAM_BUCKETS_MS):
+    """Число значений в корзинах «не больше границы», последняя — `+Inf`."""
+    counts = [0] * (len(buckets) + 1)
+    for value in values:
+        counts[bisect_left(buckets, value)] += 1
+    labels = [f'<={bucket}' for bucket in buckets] + ['+Inf']
+    return dict(zip(labels, counts))
@@ -0,0 +1,152 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .timing import RequestTimings, current_timings
+
+logger = logging.getLogger('foodgram.timing')
+capture_logger = logging.getLogger('foodgram.capture')
+
+
+class ServerTimingMiddleware:
+    """Заголовок Server-Timing и строка лога с временем запроса по этапам."""
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        request.timings = timings
+        token = current_timings.set(timings)
+        start = perf_counter()
+        stack = ExitStack()
+        try:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(timings.execute_wrapper))
+            response = self.get_response(request)
+        except BaseException:
+            stack.close()
+            raise
+        finally:
+            current_timings.reset(token)
+        # Заголовки уходят раньше тела, поэтому для потоковых ответов
+        # Server-Timing содержит только время до начала отдачи тела, а
+        # полные цифры вместе с запросами генератора попадают в лог.
+        response['Server-Timing'] = self.server_timing(timings, start)
+        if response.streaming:
+            response.streaming_content = self.stream(
+                response.streaming_content, request, response,
+                timings, start, stack)
+            return response
+        stack.close()
+        self.log(request, response, timings, start)
+        return response
+
+    def stream(self, content, request, response, timings, start, stack):
+        try:
+            with timings.measure('stream'):
+                yield from content
+        finally:
+            stack.close()
+            self.log(request, response, timings, start)
+
+    @staticmethod
+    def durations(timings, start):
+        return dict(timings.durations, total=perf_counter() - start)
+
+    def server_timing(self, timings, start):
+        return ', '.join(
+            f'{name};dur={duration * 1000:.1f}'
+            + (f';desc="{timings.queries} queries"' if name == 'db' else '')
+            for name, duration in self.durations(timings, start).items()
+        )
+
+    def log(self, request, response, timings, start):
+        logger.info(json.dumps({
+            'view': getattr(request, 'timing_view', None),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'streaming': response.streaming,
+            'queries': timings.queries,
+            **{
+                f'{name}_ms': round(duration * 1000, 1)
+                for name, duration in self.durations(timings, start).items()
+            },
+        }, ensure_ascii=False))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is None:
+            request.timing_view = view_func.__name__
+            return
+        action = (getattr(view_func, 'actions', None) or {}).get(
+            request.method.lower(), request.method.lower())
+        request.timing_view = f'{view_class.__name__}.{action}'
+
+    def process_template_response(self, request, response):
+        timings = request.timings
+        start = perf_counter()
+
+        def stop(response):
+            timings.durations['render'] += perf_counter() - start
+
+        response.add_post_render_callback(stop)
+        return response
+
+
+def redact(data):
+    if isinstance(data, dict):
+        return {
+            key: '***' if 'password' in key else redact(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [redact(value) for value in data]
+    return data
+
+
+class RequestCaptureMiddleware:
+    """Пишет выборку API-запросов в JSONL для replay_traffic."""
+
+    def __init__(self, get_response):
+        if settings.REQUEST_CAPTURE_RATE <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (not request.path.startswith('/api/')
+                or random.random() >= settings.REQUEST_CAPTURE_RATE):
+            return self.get_response(request)
+        body = self.read_body(request)
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        capture_logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'query': dict(request.GET.lists()),
+            'body': body,
+            'user': user.email if user and user.is_authenticated else None,
+            'status': response.status_code,
+        }, ensure_ascii=False))
+        return response
+
+    @staticmethod
+    def read_body(request):
+        if (request.content_type != 'application/json'
+                or int(request.META.get('CONTENT_LENGTH') or 0)
+                > settings.REQUEST_CAPTURE_MAX_BODY):
+            return None
+        try:
+            return redact(json.loads(request.body))
+        except ValueError:
+            return None
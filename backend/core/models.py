@@ -1,5 +1,6 @@
 from django.db import models
-from django.db.models import UniqueConstraint
+from django.db.models import Q, UniqueConstraint
+from django.utils import timezone
 
 from users.models import User
 
@@ -28,3 +29,57 @@ class BaseRecipeRelationModel(models.Model):
     def __str__(self):
         return (f'{self.user} добавил "{self.recipe}" '
                 f'в {self._meta.verbose_name}')
+
+
+class Task(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(max_length=100, verbose_name='Задача')
+    payload = models.JSONField(default=dict, verbose_name='Параметры')
+    key = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        verbose_name='Ключ идемпотентности'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попытки')
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5, verbose_name='Максимум попыток')
+    run_at = models.DateTimeField(
+        default=timezone.now, verbose_name='Запустить после')
+    last_error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Создана')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Изменена')
+
+    class Meta:
+        ordering = ('run_at',)
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = (
+            models.Index(fields=('status', 'run_at'),
+                         name='task_status_run_at'),
+        )
+        constraints = (
+            UniqueConstraint(fields=('key',), condition=Q(status='pending'),
+                             name='unique_pending_task_key'),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
@@ -0,0 +1,29 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimate_count(queryset):
+    """Оценка числа строк по плану запроса PostgreSQL без COUNT(*)."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        return int(cursor.fetchone()[0][0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор админки: точный COUNT(*) только для небольших выборок."""
+
+    @cached_property
+    def count(self):
+        if connections[self.object_list.db].vendor != 'postgresql':
+            return self.object_list.count()
+        estimate = estimate_count(self.object_list)
+        if estimate < ESTIMATE_THRESHOLD:
+            return self.object_list.count()
+        return estimate
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .images import IMAGE_VARIANTS
+from .storage import is_default_file
+from .tasks import enqueue
+
+
+def connect_image_tasks():
+    for model, field in IMAGE_VARIANTS:
+
+        def remember_image(sender, instance, update_fields=None,
+                           field=field, **kwargs):
+            previous = None
+            if not instance._state.adding and (
+                    update_fields is None or field in update_fields):
+                previous = sender.objects.filter(
+                    pk=instance.pk).values_list(field, flat=True).first()
+            setattr(instance, f'_previous_{field}', previous)
+
+        def create_variants(sender, instance, created, update_fields=None,
+                            model=model, field=field, **kwargs):
+            if update_fields is not None and field not in update_fields:
+                return
+            name = getattr(instance, field).name
+            if not name or is_default_file(name):
+                return
+            # Картинка не менялась: копии уже есть или стоят в очереди.
+            if not created and name == getattr(
+                    instance, f'_previous_{field}', None):
+                return
+            enqueue(
+                'generate_image_variants',
+                key=f'variants:{model}:{name}',
+                model=model, field=field, name=name
+            )
+
+        def delete_file(instance, field=field, **kwargs):
+            name = getattr(instance, field).name
+            if name:
+                enqueue('delete_unreferenced_file',
+                        key=f'delete:{name}', name=name)
+
+        pre_save.connect(
+            remember_image, sender=model, weak=False,
+            dispatch_uid=f'image_previous_{model}_{field}'
+        )
+        post_save.connect(
+            create_variants, sender=model, weak=False,
+            dispatch_uid=f'image_variants_{model}_{field}'
+        )
+        post_delete.connect(
+            delete_file, sender=model, weak=False,
+            dispatch_uid=f'image_delete_{model}_{field}'
+        )
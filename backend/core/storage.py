@@ -0,0 +1,77 @@
+import os
+import re
+
+from django.apps import apps
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+from .images import IMAGE_VARIANTS, get_variant_name, ready_variants
+
+CONTENT_ADDRESSED_NAME = re.compile(r'^[0-9a-f]{64}\.\w+$')
+
+IMAGE_FIELDS = tuple(IMAGE_VARIANTS)
+
+
+def is_content_addressed(name):
+    return bool(CONTENT_ADDRESSED_NAME.match(os.path.basename(name)))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Не дублирует файлы, имя которых - хеш их содержимого."""
+
+    def get_available_name(self, name, max_length=None):
+        if is_content_addressed(name) and self.exists(name):
+            return name
+        return super().get_available_name(name, max_length)
+
+    def _save(self, name, content):
+        if not is_content_addressed(name):
+            return super()._save(name, content)
+        if self.exists(name):
+            return name
+        # Родительский _save при FileExistsError ищет свободное имя, а
+        # get_available_name возвращает то же самое: цикл не завершится.
+        full_path = self.path(name)
+        os.makedirs(
+            os.path.dirname(full_path),
+            self.directory_permissions_mode or 0o777,
+            exist_ok=True
+        )
+        try:
+            if hasattr(content, 'temporary_file_path'):
+                file_move_safe(content.temporary_file_path(), full_path)
+            else:
+                with open(full_path, 'xb') as file:
+                    for chunk in content.chunks():
+                        file.write(chunk)
+        except FileExistsError:
+            # Тот же файл уже записала параллельная загрузка.
+            return name
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return str(name).replace('\\', '/')
+
+
+def is_file_referenced(name):
+    return any(
+        apps.get_model(model).objects.filter(**{field: name}).exists()
+        for model, field in IMAGE_FIELDS
+    )
+
+
+def is_default_file(name):
+    return any(
+        apps.get_model(model)._meta.get_field(field).default == name
+        for model, field in IMAGE_FIELDS
+    )
+
+
+def delete_unreferenced_file(storage, name):
+    if not name or is_default_file(name) or is_file_referenced(name):
+        return
+    storage.delete(name)
+    for variants in IMAGE_VARIANTS.values():
+        for variant in variants:
+            variant_name = get_variant_name(name, variant)
+            storage.delete(variant_name)
+            ready_variants.discard(variant_name)
@@ -0,0 +1,114 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .images import IMAGE_VARIANTS, generate_variants
+from .models import Task
+from .storage import delete_unreferenced_file
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+RETRY_DELAY = 30
+
+
+def task(name):
+    def register(func):
+        TASKS[name] = func
+        return func
+    return register
+
+
+def enqueue(task_name, key=None, **payload):
+    """Ставит задачу в очередь в текущей транзакции.
+
+    Пока задача с тем же key ждёт выполнения, повторная не создаётся.
+    """
+    if task_name not in TASKS:
+        raise KeyError(f'Неизвестная задача {task_name}')
+    if settings.TASK_QUEUE_EAGER:
+        transaction.on_commit(lambda: TASKS[task_name](**payload))
+        return None
+    try:
+        with transaction.atomic():
+            return Task.objects.create(
+                name=task_name, key=key, payload=payload)
+    except IntegrityError:
+        return None
+
+
+def claim_tasks(limit):
+    due = Task.objects.filter(
+        status=Task.PENDING, run_at__lte=timezone.now()
+    ).values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in due:
+        if Task.objects.filter(pk=pk, status=Task.PENDING).update(
+                status=Task.RUNNING, updated_at=timezone.now()):
+            claimed.append(pk)
+    return claimed
+
+
+def requeue_stale_tasks(stale_after):
+    return Task.objects.filter(
+        status=Task.RUNNING,
+        updated_at__lt=timezone.now() - timedelta(seconds=stale_after)
+    ).update(status=Task.PENDING, updated_at=timezone.now())
+
+
+def delete_done_tasks(keep_done):
+    """Удаляет выполненные задачи старше keep_done секунд."""
+    deleted, _ = Task.objects.filter(
+        status=Task.DONE,
+        updated_at__lt=timezone.now() - timedelta(seconds=keep_done)
+    ).delete()
+    return deleted
+
+
+def run_task(pk):
+    task = Task.objects.get(pk=pk)
+    task.attempts += 1
+    try:
+        TASKS[task.name](**task.payload)
+    except Exception:
+        logger.exception('Задача %s #%s завершилась ошибкой', task.name, pk)
+        task.last_error = traceback.format_exc()
+        if task.attempts < task.max_attempts:
+            task.status = Task.PENDING
+            task.run_at = timezone.now() + timedelta(
+                seconds=RETRY_DELAY * 2 ** (task.attempts - 1))
+        else:
+            task.status = Task.FAILED
+    else:
+        task.status = Task.DONE
+    try:
+        task.save(update_fields=(
+            'attempts', 'status', 'run_at', 'last_error', 'updated_at'))
+    except IntegrityError:
+        # Пока задача выполнялась, в очередь встала такая же.
+        task.key = None
+        task.save(update_fields=(
+            'key', 'attempts', 'status', 'run_at', 'last_error',
+            'updated_at'))
+    return task
+
+
+@task('generate_image_variants')
+def generate_image_variants(model, field, name):
+    model_field = apps.get_model(model)._meta.get_field(field)
+    generate_variants(
+        model_field.attr_class(None, model_field, name),
+        IMAGE_VARIANTS[(model, field)]
+    )
+
+
+@task('delete_unreferenced_file')
+def delete_file(name):
+    delete_unreferenced_file(default_storage, name)
@@ -0,0 +1,45 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+
+    def __init__(self):
+        self.queries = 0
+        self.durations = {
+            'db': 0.0, 'serialize': 0.0, 'render': 0.0, 'stream': 0.0}
+        self._depth = {}
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.durations['db'] += perf_counter() - start
+
+    @contextmanager
+    def measure(self, name):
+        """Учитывает только внешний вызов: вложенные уже входят в него."""
+        depth = self._depth.get(name, 0)
+        self._depth[name] = depth + 1
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._depth[name] = depth
+            if not depth:
+                self.durations[name] += perf_counter() - start
+
+
+class TimedSerializerMixin:
+
+    def to_representation(self, instance):
+        timings = current_timings.get()
+        if timings is None:
+            return super().to_representation(instance)
+        with timings.measure('serialize'):
+            return super().to_representation(instance)
@@ -40,7 +40,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
@@ -62,6 +62,8 @@ DJOSER = {
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.RequestCaptureMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -152,3 +154,57 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 CSV_DATA_PATH = 'data/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+SHORT_LINKS_MAP_PATH = os.path.join(
+    BASE_DIR, 'short_links', 'short_links.map'
+)
+
+DEFAULT_FILE_STORAGE = 'core.storage.ContentAddressedStorage'
+
+TASK_QUEUE_EAGER = os.getenv('TASK_QUEUE_EAGER', 'False') == 'True'
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'False') == 'True'
+
+REQUEST_CAPTURE_RATE = float(os.getenv('REQUEST_CAPTURE_RATE', 0))
+REQUEST_CAPTURE_PATH = os.getenv(
+    'REQUEST_CAPTURE_PATH', os.path.join(BASE_DIR, 'captured_requests.jsonl')
+)
+REQUEST_CAPTURE_MAX_BODY = 64 * 1024
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'capture': {
+            'class': 'logging.FileHandler',
+            'filename': REQUEST_CAPTURE_PATH,
+            'formatter': 'message',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'foodgram.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'foodgram.capture': {
+            'handlers': ['capture'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -3,7 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
-from api.views import RecipeViewSet
+from api.views import RecipeViewSet, redirect_short_link
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,7 +12,5 @@ urlpatterns = [
     path('api/recipes/<int:pk>/get-link/',
          RecipeViewSet.as_view({'get': 'handle_short_link'}),
          name='get-short-link'),
-    path('s/<short_hash>/',
-         RecipeViewSet.as_view({'get': 'handle_short_link'}),
-         name='redirect-to-recipe'),
+    path('s/<short_hash>/', redirect_short_link, name='redirect-to-recipe'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,13 +1,16 @@
 from django.contrib import admin
 from django.contrib.admin import display
+from django.db.models import Prefetch
 from django.forms.models import BaseInlineFormSet
 
+from core.admin import LargeTableAdminMixin
 from .models import (
     Favorite,
     Tag,
     Ingredient,
     Recipe,
     RecipeIngredient,
+    ShoppingListIngredient,
     ShoppingListItem
 )
 
@@ -15,22 +18,33 @@ from .models import (
 class RecipeIngredientInline(admin.TabularInline):
     model = RecipeIngredient
     formset = BaseInlineFormSet
+    autocomplete_fields = ('ingredient',)
     min_num = 1
     extra = 1
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'id', 'author',
                     'ingredients_list', 'added_in_favorites')
+    list_select_related = ('author',)
     readonly_fields = ('added_in_favorites',)
     list_filter = ('tags',)
     search_fields = ('name', 'author__username')
+    autocomplete_fields = ('author',)
     inlines = [RecipeIngredientInline]
 
-    @display(description='Кол-во в избранных')
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(
+            'search_vector'
+        ).prefetch_related(Prefetch(
+            'recipeingredient',
+            RecipeIngredient.objects.select_related('ingredient')
+        ))
+
+    @display(description='Кол-во в избранных', ordering='favorites_count')
     def added_in_favorites(self, obj):
-        return obj.favorites.count()
+        return obj.favorites_count
 
     @display(description='Ингредиенты')
     def ingredients_list(self, obj):
@@ -40,10 +54,10 @@ class RecipeAdmin(admin.ModelAdmin):
 
 
 @admin.register(Ingredient)
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'measurement_unit',)
-    list_filter = ('name',)
-    search_fields = ('name',)
+    search_fields = ('^name',)
+    ordering = ('name',)
 
 
 @admin.register(Tag)
@@ -52,15 +66,28 @@ class TagAdmin(admin.ModelAdmin):
 
 
 @admin.register(ShoppingListItem)
-class ShoppingListItemAdmin(admin.ModelAdmin):
+class ShoppingListItemAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'recipe',)
+    list_select_related = ('user', 'recipe')
+    autocomplete_fields = ('user', 'recipe')
+
+
+@admin.register(ShoppingListIngredient)
+class ShoppingListIngredientAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('user', 'ingredient', 'amount',)
+    list_select_related = ('user', 'ingredient')
+    autocomplete_fields = ('user', 'ingredient')
 
 
 @admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
+class FavoriteAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'recipe',)
+    list_select_related = ('user', 'recipe')
+    autocomplete_fields = ('user', 'recipe')
 
 
 @admin.register(RecipeIngredient)
-class RecipeIngredient(admin.ModelAdmin):
+class RecipeIngredientAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('recipe', 'ingredient', 'amount',)
+    list_select_related = ('recipe', 'ingredient')
+    autocomplete_fields = ('recipe', 'ingredient')
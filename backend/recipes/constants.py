@@ -5,3 +5,14 @@ LINK_LENGTH = 8
 AMOUNT_MIN = 1
 AMOUNT_MAX = 32767
 SITE_URL = 'https://foodgraming.ddnsking.com'
+REFERENCE_CACHE_TTL = 300
+SHORT_LINK_WIDTH = 5
+SHORT_LINK_MULTIPLIER = 387420489
+SHORT_LINK_OFFSET = 104729
+SHORT_LINK_CACHE_SIZE = 10000
+IMAGE_MAX_SIZE = 5 * 1024 * 1024
+RESPONSE_CACHE_TTL = 60
+RESPONSE_CACHE_STALE_TTL = 600
+RESPONSE_CACHE_LOCK_TIMEOUT = 10
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TTL = 60
@@ -0,0 +1,52 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from users.models import Follow, User
+from .models import Favorite, Recipe
+
+# Модель со счётчиком, поле счётчика, модель строк и поле связи с ней.
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Follow, 'following'),
+)
+
+
+def change_counter(model, pk, field, delta):
+    if pk is None:
+        return
+    model.objects.filter(pk=pk).update(
+        **{field: Greatest(F(field) + delta, 0)})
+
+
+def actual_count(related_model, relation):
+    return Coalesce(Subquery(
+        related_model.objects.filter(**{relation: OuterRef('pk')})
+        .order_by().values(relation).annotate(count=Count('pk'))
+        .values('count')
+    ), Value(0))
+
+
+def reconcile_counter(model, field, related_model, relation, batch_size):
+    """Исправляет расхождения счётчика пачками по диапазонам pk."""
+    fixed = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            model.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return fixed
+        last_pk = pks[-1]
+        drifted = [
+            model(pk=pk, **{field: actual})
+            for pk, current, actual in model.objects.filter(
+                pk__range=(pks[0], last_pk)
+            ).annotate(
+                actual=actual_count(related_model, relation)
+            ).values_list('pk', field, 'actual')
+            if current != actual
+        ]
+        model.objects.bulk_update(drifted, (field,))
+        fixed += len(drifted)
@@ -0,0 +1,40 @@
+from bisect import bisect_left
+
+
+def normalize(value):
+    return value.casefold().replace('ё', 'е').strip()
+
+
+class IngredientIndex:
+    """Каталог ингредиентов в памяти для поиска по названию.
+
+    Строится из готового снимка справочника, поэтому результаты поиска
+    совпадают с версией, по которой считается ETag.
+    """
+
+    def __init__(self, entries):
+        rows = sorted(
+            (normalize(entry['name']), entry['id'], entry) for entry in entries
+        )
+        self._keys = [key for key, *_ in rows]
+        self._entries = [entry for *_, entry in rows]
+
+    def search(self, query):
+        keys, entries = self._keys, self._entries
+        query = normalize(query)
+        if not query:
+            return list(entries)
+        start = bisect_left(keys, query)
+        exact, prefix = [], []
+        position = start
+        while position < len(keys) and keys[position].startswith(query):
+            if keys[position] == query:
+                exact.append(entries[position])
+            else:
+                prefix.append(entries[position])
+            position += 1
+        substring = [
+            entries[index] for index, key in enumerate(keys)
+            if (index < start or index >= position) and query in key
+        ]
+        return exact + prefix + substring
@@ -1,42 +1,163 @@
 import csv
+import json
 import os
+from itertools import islice
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 
 from recipes.models import Ingredient, Tag
 
+CHUNK_SIZE = 64 * 1024
+MAX_OBJECT_SIZE = 4 * CHUNK_SIZE
+
+
+def read_csv(file):
+    yield from csv.DictReader(file)
+
+
+def read_ndjson(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer = file.read(CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError('Ожидается JSON-массив объектов.')
+    offset = len(buffer[:1].encode('utf-8'))
+    buffer = buffer[1:]
+    eof = False
+    while True:
+        stripped = buffer.lstrip().lstrip(',').lstrip()
+        offset += len(buffer[:len(buffer) - len(stripped)].encode('utf-8'))
+        buffer = stripped
+        if buffer.startswith(']'):
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Битая запись не должна тянуть в память остаток файла.
+            if len(buffer) > MAX_OBJECT_SIZE:
+                raise CommandError(
+                    f'Некорректный JSON-объект со смещения {offset} байт.')
+            chunk = file.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield obj
+        offset += len(buffer[:end].encode('utf-8'))
+        buffer = buffer[end:]
+
 
 class Command(BaseCommand):
+    help = 'Импортирует ингредиенты и теги из CSV, JSON или NDJSON.'
     models_files = {
         Ingredient: 'ingredients.csv',
         Tag: 'tags.csv',
     }
+    models = {
+        'ingredients': Ingredient,
+        'tags': Tag,
+    }
+    readers = {
+        '.csv': read_csv,
+        '.json': read_json,
+        '.ndjson': read_ndjson,
+        '.jsonl': read_ndjson,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files', nargs='*',
+            help='Файлы для импорта (по умолчанию ingredients.csv и '
+                 'tags.csv из CSV_DATA_PATH).'
+        )
+        parser.add_argument(
+            '--model', choices=self.models,
+            help='Модель для файлов; по умолчанию по имени файла.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Прочитать и проверить файлы без записи в базу.'
+        )
 
     def handle(self, *args, **options):
-        csv_path = settings.CSV_DATA_PATH
-        for model, filename in self.models_files.items():
-            self.import_data(model, os.path.join(csv_path, filename))
+        if options['files']:
+            jobs = [
+                (self.get_model(filename, options['model']), filename)
+                for filename in options['files']
+            ]
+        else:
+            csv_path = settings.CSV_DATA_PATH
+            jobs = [
+                (model, os.path.join(csv_path, filename))
+                for model, filename in self.models_files.items()
+            ]
+        for model, filename in jobs:
+            self.import_data(
+                model, filename, options['batch_size'], options['dry_run'])
+
+    def get_model(self, filename, model_name):
+        if model_name:
+            return self.models[model_name]
+        for prefix, model in self.models.items():
+            if os.path.basename(filename).startswith(prefix):
+                return model
+        raise CommandError(f'Не удалось определить модель для {filename}, '
+                           'укажите --model.')
+
+    @staticmethod
+    def clean_row(row, fields):
+        if not isinstance(row, dict):
+            return None
+        values = {
+            field: str(row.get(field) or '').strip() for field in fields
+        }
+        if not all(values.values()):
+            return None
+        return values
 
-    def import_data(self, model, filename):
+    def import_data(self, model, filename, batch_size, dry_run):
+        reader = self.readers.get(os.path.splitext(filename)[1].lower())
+        if reader is None:
+            raise CommandError(f'Неизвестный формат файла {filename}.')
+        fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key
+        ]
         try:
             self.stdout.write(self.style.WARNING(f'Импортируем {filename}'))
+            existed = model.objects.count()
+            read = skipped = 0
             with open(filename, encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                next_id = (
-                    model.objects.last().id + 1
-                    if model.objects.exists()
-                    else 1
-                )
-                for row in reader:
-                    obj, created = model.objects.update_or_create(
-                        defaults=row,
-                        **row
-                    )
-                    if created:
-                        obj.id = next_id
-                        obj.save()
-                        next_id += 1
-            self.stdout.write(self.style.SUCCESS(f'Импортирован {filename}'))
-        except Exception as e:
+                rows = reader(file)
+                while True:
+                    chunk = list(islice(rows, batch_size))
+                    if not chunk:
+                        break
+                    read += len(chunk)
+                    batch = []
+                    for row in chunk:
+                        values = self.clean_row(row, fields)
+                        if values is None:
+                            skipped += 1
+                            continue
+                        batch.append(model(**values))
+                    if batch and not dry_run:
+                        model.objects.bulk_create(
+                            batch, ignore_conflicts=True)
+                    self.stdout.write(f'  обработано строк: {read}')
+            created = 0 if dry_run else model.objects.count() - existed
+            self.stdout.write(self.style.SUCCESS(
+                f'{"Проверен" if dry_run else "Импортирован"} {filename}: '
+                f'прочитано {read}, добавлено {created}, '
+                f'пропущено {skipped}'
+            ))
+        except (OSError, ValueError) as e:
             self.stdout.write(self.style.ERROR(f'Ошибка {filename}: {e}'))
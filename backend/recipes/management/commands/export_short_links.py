@@ -0,0 +1,37 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.constants import SITE_URL
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Выгружает короткие ссылки рецептов в map-файл для nginx.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=settings.SHORT_LINKS_MAP_PATH,
+            help='Путь к map-файлу.'
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        links = Recipe.objects.filter(
+            short_link__isnull=False
+        ).order_by('pk').values_list('short_link', 'pk')
+        tmp_output = f'{output}.tmp'
+        count = 0
+        with open(tmp_output, 'w', encoding='utf-8') as file:
+            for short_link, pk in links.iterator():
+                target = f'{SITE_URL}/recipes/{pk}/'
+                # API отдаёт ссылку без слеша, Django принимает и со слешем.
+                file.write(f'/s/{short_link} {target};\n')
+                file.write(f'/s/{short_link}/ {target};\n')
+                count += 1
+        os.replace(tmp_output, output)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено ссылок: {count} в {output}'))
@@ -0,0 +1,26 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.images import IMAGE_VARIANTS, generate_variants
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии для уже загруженных изображений.'
+
+    def handle(self, *args, **options):
+        for (model_name, field), variants in IMAGE_VARIANTS.items():
+            model = apps.get_model(model_name)
+            names = model.objects.exclude(
+                **{f'{field}__isnull': True}
+            ).exclude(**{field: ''}).values_list(
+                field, flat=True
+            ).distinct().order_by()
+            created = 0
+            for name in names.iterator():
+                created += generate_variants(
+                    model._meta.get_field(field).attr_class(
+                        None, model._meta.get_field(field), name),
+                    variants
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'{model_name}.{field}: создано копий {created}'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.counters import COUNTERS, reconcile_counter
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики и исправляет расхождения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model, field, related_model, relation in COUNTERS:
+            with transaction.atomic():
+                fixed = reconcile_counter(
+                    model, field, related_model, relation,
+                    options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{model.__name__}.{field}: исправлено {fixed}'))
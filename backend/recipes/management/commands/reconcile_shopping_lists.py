@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import ShoppingListIngredient
+from recipes.shopping_lists import iter_shopping_list_totals
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает суммарные списки покупок пользователей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Пересобрать только для пользователя с этим id.'
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+        lists = ShoppingListIngredient.objects.all()
+        if user_ids:
+            lists = lists.filter(user_id__in=user_ids)
+        lists.delete()
+        batch, count = [], 0
+        for row in iter_shopping_list_totals(user_ids):
+            batch.append(ShoppingListIngredient(
+                user_id=row['recipe__shoppinglistitems__user_id'],
+                ingredient_id=row['ingredient_id'],
+                amount=row['amount']
+            ))
+            if len(batch) >= BATCH_SIZE:
+                ShoppingListIngredient.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        ShoppingListIngredient.objects.bulk_create(batch)
+        count += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересобрано строк списков покупок: {count}'))
@@ -0,0 +1,241 @@
+import csv
+import io
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingListItem,
+    Tag
+)
+from recipes.services import generate_short_link
+from users.models import Follow, User
+
+SEED_PASSWORD = 'seed-password'
+BASE_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+COPY_NULL = r'\N'
+AMOUNTS = (1, 2, 3, 5, 10, 50, 100, 150, 200, 250, 500, 1000)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def next_pk(model):
+    return (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+
+
+def copy_rows(model, rows):
+    fields = [
+        field for field in model._meta.concrete_fields
+        if field.attname in rows[0] or not field.primary_key
+    ]
+    defaults = {
+        field.attname: field.get_default()
+        for field in fields if field.attname not in rows[0]
+    }
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = (row.get(field.attname, defaults.get(field.attname))
+                  for field in fields)
+        writer.writerow(
+            COPY_NULL if value is None else value for value in values)
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {quote(model._meta.db_table)} ({columns}) '
+            f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            buffer
+        )
+
+
+@contextmanager
+def explicit_created_at():
+    field = Recipe._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, рецептами, '
+            'подписками, избранным и списками покупок.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument(
+            '--ingredients', type=int, default=0,
+            help='Добавить синтетические ингредиенты к справочнику.')
+        parser.add_argument(
+            '--tags', type=int, default=0,
+            help='Добавить синтетические теги к справочнику.')
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--follows-per-user', type=int, default=10)
+        parser.add_argument('--favorites-per-user', type=int, default=20)
+        parser.add_argument('--cart-per-user', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            ingredients, tags = self.create_catalog(
+                options['ingredients'], options['tags'])
+            if not ingredients or not tags:
+                raise CommandError(
+                    'Сначала загрузите ингредиенты и теги: '
+                    'python manage.py data_import')
+            users = self.create_users(options['users'])
+            recipes = self.create_recipes(
+                options['recipes'], users, tags, ingredients,
+                options['ingredients_per_recipe'])
+            self.create_follows(users, options['follows_per_user'])
+            self.create_relations(
+                Favorite, users, recipes, options['favorites_per_user'])
+            self.create_relations(
+                ShoppingListItem, users, recipes, options['cart_per_user'])
+            self.reset_sequences()
+        call_command('reconcile_shopping_lists', stdout=self.stdout)
+        call_command('reconcile_counters', stdout=self.stdout)
+
+    def insert(self, model, rows, label=None):
+        count = 0
+        for batch in batched(rows, self.batch_size):
+            if connection.vendor == 'postgresql':
+                copy_rows(model, batch)
+            else:
+                model.objects.bulk_create(
+                    [model(**row) for row in batch], ignore_conflicts=True)
+            count += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'{label or model._meta.verbose_name_plural}: {count}'))
+
+    def create_catalog(self, ingredients, tags):
+        start = next_pk(Ingredient)
+        self.insert(Ingredient, (
+            {'name': f'ингредиент {i}', 'measurement_unit': 'г'}
+            for i in range(start, start + ingredients)
+        ))
+        start = next_pk(Tag)
+        self.insert(Tag, (
+            {'name': f'Тег {i}', 'slug': f'tag{i}'}
+            for i in range(start, start + tags)
+        ))
+        return (
+            list(Ingredient.objects.order_by('pk')
+                 .values_list('pk', flat=True)),
+            list(Tag.objects.order_by('pk').values_list('pk', flat=True))
+        )
+
+    def create_users(self, count):
+        start = next_pk(User)
+        password = make_password(SEED_PASSWORD)
+        self.insert(User, (
+            {
+                'id': pk, 'email': f'seed{pk}@example.com',
+                'username': f'seed{pk}', 'first_name': 'Пользователь',
+                'last_name': str(pk), 'password': password,
+            }
+            for pk in range(start, start + count)
+        ))
+        return range(start, start + count)
+
+    def create_recipes(self, count, users, tags, ingredients, per_recipe):
+        start = next_pk(Recipe)
+        recipes = range(start, start + count)
+        # Популярность ингредиентов распределена по закону Ципфа.
+        cum_weights = list(accumulate(
+            1 / rank for rank in range(1, len(ingredients) + 1)))
+        popular = ingredients[:]
+        self.rng.shuffle(popular)
+        with explicit_created_at():
+            self.insert(Recipe, (
+                {
+                    'id': pk, 'author_id': self.rng.choice(users),
+                    'name': f'Рецепт {pk}',
+                    'text': f'Описание рецепта {pk}',
+                    'cooking_time': self.rng.randint(5, 180),
+                    'short_link': generate_short_link(pk),
+                    'created_at': BASE_DATE + timedelta(
+                        minutes=(pk - start) * 7,
+                        seconds=self.rng.randint(0, 59)),
+                }
+                for pk in recipes
+            ))
+        self.insert(Recipe.tags.through, (
+            {'recipe_id': pk, 'tag_id': tag}
+            for pk in recipes
+            for tag in self.rng.sample(
+                tags, self.rng.randint(1, min(3, len(tags))))
+        ), label='Теги рецептов')
+        self.insert(RecipeIngredient, (
+            {
+                'recipe_id': pk, 'ingredient_id': ingredient,
+                'amount': self.rng.choice(AMOUNTS),
+            }
+            for pk in recipes
+            for ingredient in self.sample_weighted(
+                popular, cum_weights,
+                max(1, round(self.rng.gauss(per_recipe, per_recipe / 3))))
+        ))
+        return recipes
+
+    def sample_weighted(self, population, cum_weights, count):
+        chosen = set()
+        count = min(count, len(population))
+        while len(chosen) < count:
+            chosen.update(self.rng.choices(
+                population, cum_weights=cum_weights, k=count - len(chosen)))
+        return sorted(chosen)
+
+    def create_follows(self, users, per_user):
+        per_user = min(per_user, len(users) - 1)
+        if per_user <= 0:
+            return
+        self.insert(Follow, (
+            {'user_id': user, 'following_id': following}
+            for user in users
+            for following in [
+                following
+                for following in self.rng.sample(users, per_user + 1)
+                if following != user
+            ][:per_user]
+        ))
+
+    def create_relations(self, model, users, recipes, per_user):
+        per_user = min(per_user, len(recipes))
+        self.insert(model, (
+            {'user_id': user, 'recipe_id': recipe}
+            for user in users
+            for recipe in self.rng.sample(recipes, per_user)
+        ))
+
+    def reset_sequences(self):
+        sql = connection.ops.sequence_reset_sql(no_style(), (User, Recipe))
+        with connection.cursor() as cursor:
+            for statement in sql:
+                cursor.execute(statement)
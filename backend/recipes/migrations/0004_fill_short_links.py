@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from recipes.services import assign_short_link
+
+
+def fill_short_links(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    recipes = Recipe.objects.filter(short_link__isnull=True).only('pk')
+    for recipe in recipes.iterator():
+        assign_short_link(recipe)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_remove_favorite_unique_favorite_recipes_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_short_links, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2 on 2026-10-17 06:17
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+from recipes.search_index import install_search_index
+
+
+def fill_counters(apps, schema_editor):
+    counters = (
+        ('recipes', 'Recipe', 'favorites_count', 'Favorite', 'recipe'),
+        ('users', 'User', 'recipes_count', 'Recipe', 'author'),
+        ('users', 'User', 'followers_count', 'Follow', 'following'),
+    )
+    for app_label, model_name, field, related_name, relation in counters:
+        model = apps.get_model(app_label, model_name)
+        related_model = apps.get_model(
+            'users' if related_name == 'Follow' else 'recipes', related_name)
+        model.objects.update(**{field: Coalesce(models.Subquery(
+            related_model.objects.filter(**{relation: models.OuterRef('pk')})
+            .order_by().values(relation)
+            .annotate(count=models.Count('pk')).values('count')
+        ), models.Value(0))})
+
+
+def restore_search_index(apps, schema_editor):
+    # На SQLite AddField пересоздаёт таблицу вместе с её триггерами.
+    install_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_search'),
+        ('users', '0004_user_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Кол-во в избранных'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-favorites_count', '-created_at'], name='recipe_favorites_count'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+        migrations.RunPython(
+            restore_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+from recipes.search_index import drop_search_index, install_search_index
+
+
+def reinstall_search_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection)
+    install_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_favorites_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            reinstall_search_index, migrations.RunPython.noop),
+    ]
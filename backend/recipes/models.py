@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import UniqueConstraint
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -10,8 +11,9 @@ from .constants import (
     AMOUNT_MIN,
     AMOUNT_MAX
 )
-from .services import get_unique_short_link
+from .services import assign_short_link
 from users.models import User
+from core.counters import CountersMixin
 from core.models import BaseRecipeRelationModel
 
 
@@ -57,7 +59,9 @@ class Ingredient(models.Model):
         return f'{self.name} ({self.measurement_unit})'
 
 
-class Recipe(models.Model):
+class Recipe(CountersMixin, models.Model):
+    counter_fields = ('favorites_count',)
+
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -106,16 +110,33 @@ class Recipe(models.Model):
         auto_now_add=True,
         verbose_name='Дата создания'
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Кол-во в избранных'
+    )
 
     class Meta:
         ordering = ('-created_at',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = (
+            models.Index(fields=('created_at', 'id'),
+                         name='recipe_created_at_id'),
+            models.Index(fields=('author', 'created_at'),
+                         name='recipe_author_created_at'),
+            models.Index(fields=('-favorites_count', '-created_at'),
+                         name='recipe_favorites_count'),
+        )
 
     def save(self, *args, **kwargs):
-        if not self.short_link:
-            self.short_link = get_unique_short_link(Recipe)
         super().save(*args, **kwargs)
+        if not self.short_link:
+            assign_short_link(self)
 
     def __str__(self):
         return self.name
@@ -167,3 +188,30 @@ class Favorite(BaseRecipeRelationModel):
     class Meta(BaseRecipeRelationModel.Meta):
         verbose_name = 'Избранное'
         verbose_name_plural = 'Избранное'
+
+
+class ShoppingListIngredient(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shoppinglistingredients',
+        verbose_name='Пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shoppinglistingredients',
+        verbose_name='Ингредиент'
+    )
+    amount = models.PositiveIntegerField('Кол-во')
+
+    class Meta:
+        verbose_name = 'Ингредиент в списке покупок'
+        verbose_name_plural = 'Ингредиенты в списках покупок'
+        constraints = (
+            UniqueConstraint(fields=('user', 'ingredient'),
+                             name='unique_shopping_list_ingredient'),
+        )
+
+    def __str__(self):
+        return f'{self.amount} {self.ingredient} для {self.user}'
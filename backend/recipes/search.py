@@ -0,0 +1,48 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+
+from .indexes import normalize
+
+SEARCH_CONFIG = 'russian'
+TOKEN_RE = re.compile(r'\w+')
+
+
+def search_postgresql(queryset, value):
+    query = SearchQuery(
+        value.replace('ё', 'е').replace('Ё', 'Е'),
+        config=SEARCH_CONFIG, search_type='websearch'
+    )
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query))
+
+
+def search_sqlite(queryset, value):
+    # FTS5 не умеет русский стемминг: ищем слова по префиксу.
+    tokens = TOKEN_RE.findall(normalize(value))
+    if not tokens:
+        return queryset.none()
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    return queryset.filter(pk__in=RawSQL(
+        'SELECT rowid FROM recipes_recipe_fts '
+        'WHERE recipes_recipe_fts MATCH %s', (match,)
+    )).annotate(search_rank=RawSQL(
+        'SELECT -bm25(recipes_recipe_fts, 4.0, 1.0) FROM recipes_recipe_fts '
+        'WHERE recipes_recipe_fts MATCH %s '
+        'AND recipes_recipe_fts.rowid = recipes_recipe.id', (match,)
+    ))
+
+
+def search_recipes(queryset, value):
+    """Полнотекстовый поиск по названию и описанию с ранжированием."""
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        queryset = search_postgresql(queryset, value)
+    elif vendor == 'sqlite':
+        queryset = search_sqlite(queryset, value)
+    else:
+        return queryset.filter(name__icontains=value)
+    return queryset.order_by('-search_rank', '-created_at')
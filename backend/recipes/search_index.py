@@ -0,0 +1,125 @@
+"""Служебные объекты полнотекстового поиска рецептов в базе.
+
+Триггеры SQLite пропадают при пересоздании таблицы recipes_recipe
+в миграциях, поэтому установка идемпотентна и повторяется после migrate.
+"""
+
+FTS_TABLE = 'recipes_recipe_fts'
+SQLITE_TRIGGERS = (
+    'recipes_recipe_fts_insert',
+    'recipes_recipe_fts_delete',
+    'recipes_recipe_fts_update',
+)
+
+
+def normalized(column):
+    return f"replace(replace(coalesce({column}, ''), 'ё', 'е'), 'Ё', 'Е')"
+
+
+POSTGRES_INSTALL = (
+    f"""
+    CREATE OR REPLACE FUNCTION recipes_recipe_search_vector()
+    RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', {normalized('NEW.name')}), 'A')
+            || setweight(
+                to_tsvector('russian', {normalized('NEW.text')}), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    'DROP TRIGGER IF EXISTS recipes_recipe_search_vector_update '
+    'ON recipes_recipe;',
+    """
+    CREATE TRIGGER recipes_recipe_search_vector_update
+    BEFORE INSERT OR UPDATE OF name, text ON recipes_recipe
+    FOR EACH ROW EXECUTE FUNCTION recipes_recipe_search_vector();
+    """,
+    'CREATE INDEX IF NOT EXISTS recipe_search_vector ON recipes_recipe '
+    'USING gin (search_vector);',
+)
+POSTGRES_REBUILD = ('UPDATE recipes_recipe SET name = name;',)
+POSTGRES_DROP = (
+    'DROP INDEX IF EXISTS recipe_search_vector;',
+    'DROP TRIGGER IF EXISTS recipes_recipe_search_vector_update '
+    'ON recipes_recipe;',
+    'DROP FUNCTION IF EXISTS recipes_recipe_search_vector();',
+)
+
+FTS_INSERT = (
+    f'INSERT INTO {FTS_TABLE}(rowid, name, text) '
+    f"VALUES (new.id, {normalized('new.name')}, {normalized('new.text')});"
+)
+FTS_DELETE = f'DELETE FROM {FTS_TABLE} WHERE rowid = old.id;'
+SQLITE_INSTALL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, text, tokenize='unicode61 remove_diacritics 2'
+    );
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_insert
+    AFTER INSERT ON recipes_recipe
+    BEGIN {FTS_INSERT} END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_delete
+    AFTER DELETE ON recipes_recipe
+    BEGIN {FTS_DELETE} END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_update
+    AFTER UPDATE ON recipes_recipe
+    BEGIN {FTS_DELETE} {FTS_INSERT} END;
+    """,
+)
+SQLITE_REBUILD = (
+    f'DELETE FROM {FTS_TABLE};',
+    f'INSERT INTO {FTS_TABLE}(rowid, name, text) '
+    f"SELECT id, {normalized('name')}, {normalized('text')} "
+    'FROM recipes_recipe;',
+)
+SQLITE_DROP = tuple(
+    f'DROP TRIGGER IF EXISTS {trigger};' for trigger in SQLITE_TRIGGERS
+) + (f'DROP TABLE IF EXISTS {FTS_TABLE};',)
+
+STATEMENTS = {
+    'postgresql': (POSTGRES_INSTALL, POSTGRES_REBUILD, POSTGRES_DROP),
+    'sqlite': (SQLITE_INSTALL, SQLITE_REBUILD, SQLITE_DROP),
+}
+
+
+def execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install_search_index(connection):
+    """Создаёт недостающие объекты поиска и переиндексирует рецепты."""
+    statements = STATEMENTS.get(connection.vendor)
+    if statements is not None:
+        execute(connection, statements[0] + statements[1])
+
+
+def drop_search_index(connection):
+    statements = STATEMENTS.get(connection.vendor)
+    if statements is not None:
+        execute(connection, statements[2])
+
+
+def repair_search_index(connection):
+    """Восстанавливает триггеры SQLite, если их удалила миграция."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE name = %s OR (type = 'trigger' AND name IN (%s, %s, %s))",
+            (FTS_TABLE, *SQLITE_TRIGGERS)
+        )
+        found = cursor.fetchall()
+    if any(name == FTS_TABLE for _, name in found) and len(found) < len(
+            SQLITE_TRIGGERS) + 1:
+        install_search_index(connection)
@@ -1,15 +1,46 @@
-import hashlib
-import random
+import string
 
+from django.db import IntegrityError, transaction
 
-def generate_short_link():
-    random_number = random.randint(0, 10000)
-    hash_object = hashlib.md5(str(random_number).encode())
-    return hash_object.hexdigest()[:3]
+from .constants import (
+    LINK_LENGTH,
+    SHORT_LINK_MULTIPLIER,
+    SHORT_LINK_OFFSET,
+    SHORT_LINK_WIDTH
+)
 
+SHORT_LINK_ALPHABET = string.digits + string.ascii_letters
+SHORT_LINK_SPACE = len(SHORT_LINK_ALPHABET) ** SHORT_LINK_WIDTH
 
-def get_unique_short_link(model_class):
-    short_link = generate_short_link()
-    while model_class.objects.filter(short_link=short_link).exists():
-        short_link = generate_short_link()
-    return short_link
+
+def to_base62(value):
+    digits = []
+    while value:
+        value, remainder = divmod(value, len(SHORT_LINK_ALPHABET))
+        digits.append(SHORT_LINK_ALPHABET[remainder])
+    return ''.join(reversed(digits))
+
+
+def generate_short_link(pk, padding=0):
+    """Биекция pk -> код; padding даёт запасные коды с ведущими нулями."""
+    block, offset = divmod(pk, SHORT_LINK_SPACE)
+    value = block * SHORT_LINK_SPACE + (
+        offset * SHORT_LINK_MULTIPLIER + SHORT_LINK_OFFSET
+    ) % SHORT_LINK_SPACE
+    code = to_base62(value).rjust(SHORT_LINK_WIDTH, SHORT_LINK_ALPHABET[0])
+    return SHORT_LINK_ALPHABET[0] * padding + code
+
+
+def assign_short_link(recipe):
+    code = generate_short_link(recipe.pk)
+    for padding in range(LINK_LENGTH - len(code) + 1):
+        code = generate_short_link(recipe.pk, padding)
+        try:
+            with transaction.atomic():
+                type(recipe).objects.filter(pk=recipe.pk).update(
+                    short_link=code)
+        except IntegrityError:
+            continue
+        recipe.short_link = code
+        return code
+    return None
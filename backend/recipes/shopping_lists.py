@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Greatest
+
+from .models import RecipeIngredient, ShoppingListIngredient, ShoppingListItem
+
+# Пока True, сигналы RecipeIngredient не меняют списки покупок.
+signals_suspended = ContextVar('shopping_list_signals_suspended',
+                               default=False)
+
+
+def change_shopping_lists(user_ids, recipe_id, sign):
+    """Прибавляет (sign=1) или вычитает (sign=-1) ингредиенты рецепта."""
+    user_ids = list(user_ids)
+    ingredient_ids = list(RecipeIngredient.objects.filter(
+        recipe_id=recipe_id).values_list('ingredient_id', flat=True))
+    if not user_ids or not ingredient_ids:
+        return
+    if sign > 0:
+        ShoppingListIngredient.objects.bulk_create([
+            ShoppingListIngredient(
+                user_id=user_id, ingredient_id=ingredient_id, amount=0)
+            for user_id in user_ids
+            for ingredient_id in ingredient_ids
+        ], ignore_conflicts=True)
+    amount = Subquery(RecipeIngredient.objects.filter(
+        recipe_id=recipe_id, ingredient=OuterRef('ingredient')
+    ).values('amount')[:1])
+    lists = ShoppingListIngredient.objects.filter(
+        user_id__in=user_ids, ingredient_id__in=ingredient_ids)
+    lists.update(amount=(
+        F('amount') + amount if sign > 0
+        else Greatest(F('amount') - amount, 0)
+    ))
+    if sign < 0:
+        lists.filter(amount__lte=0).delete()
+
+
+def change_ingredient_amount(user_ids, ingredient_id, delta):
+    user_ids = list(user_ids)
+    if not user_ids or not delta:
+        return
+    if delta > 0:
+        ShoppingListIngredient.objects.bulk_create([
+            ShoppingListIngredient(
+                user_id=user_id, ingredient_id=ingredient_id, amount=0)
+            for user_id in user_ids
+        ], ignore_conflicts=True)
+    lists = ShoppingListIngredient.objects.filter(
+        user_id__in=user_ids, ingredient_id=ingredient_id)
+    lists.update(amount=Greatest(F('amount') + delta, 0))
+    if delta < 0:
+        lists.filter(amount__lte=0).delete()
+
+
+@contextmanager
+def replacing_recipe_ingredients(recipe_id):
+    """Пакетная замена ингредиентов рецепта, в том числе bulk_create.
+
+    Рецепт целиком вычитается из списков покупателей и добавляется обратно,
+    а построчные сигналы на это время отключены.
+    """
+    buyers = get_recipe_buyers(recipe_id)
+    change_shopping_lists(buyers, recipe_id, -1)
+    token = signals_suspended.set(True)
+    try:
+        yield
+    finally:
+        signals_suspended.reset(token)
+    change_shopping_lists(buyers, recipe_id, 1)
+
+
+def get_recipe_buyers(recipe_id):
+    return list(ShoppingListItem.objects.filter(
+        recipe_id=recipe_id).values_list('user_id', flat=True))
+
+
+def iter_shopping_list_totals(user_ids=None):
+    items = RecipeIngredient.objects.filter(
+        recipe__shoppinglistitems__isnull=False)
+    if user_ids is not None:
+        items = items.filter(recipe__shoppinglistitems__user_id__in=user_ids)
+    return items.values(
+        'recipe__shoppinglistitems__user_id', 'ingredient_id'
+    ).annotate(amount=Sum('amount')).order_by().iterator()
@@ -0,0 +1,106 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from users.models import Follow, User
+from .counters import change_counter
+from .models import (
+    Favorite,
+    Recipe,
+    RecipeIngredient,
+    ShoppingListItem
+)
+from .search_index import repair_search_index as repair_index
+from .shopping_lists import (
+    change_ingredient_amount,
+    change_shopping_lists,
+    get_recipe_buyers,
+    signals_suspended
+)
+
+
+@receiver(post_save, sender=ShoppingListItem)
+def add_to_shopping_list(instance, created, **kwargs):
+    if created:
+        change_shopping_lists((instance.user_id,), instance.recipe_id, 1)
+
+
+# post_delete, а не pre_delete: при каскадном удалении рецепта строки
+# RecipeIngredient и ShoppingListItem удаляются в разном порядке, и рецепт
+# вычитается ровно один раз тем сигналом, который сработал первым.
+@receiver(post_delete, sender=ShoppingListItem)
+def remove_from_shopping_list(instance, **kwargs):
+    change_shopping_lists((instance.user_id,), instance.recipe_id, -1)
+
+
+@receiver(pre_save, sender=RecipeIngredient)
+def remember_recipe_ingredient(instance, **kwargs):
+    instance._previous = None
+    if instance.pk is not None and not signals_suspended.get():
+        instance._previous = RecipeIngredient.objects.filter(
+            pk=instance.pk
+        ).values('recipe_id', 'ingredient_id', 'amount').first()
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def update_shopping_lists_amount(instance, **kwargs):
+    if signals_suspended.get():
+        return
+    previous = getattr(instance, '_previous', None)
+    buyers = get_recipe_buyers(instance.recipe_id)
+    if (previous and previous['recipe_id'] == instance.recipe_id
+            and previous['ingredient_id'] == instance.ingredient_id):
+        change_ingredient_amount(
+            buyers, instance.ingredient_id,
+            instance.amount - previous['amount'])
+        return
+    if previous:
+        change_ingredient_amount(
+            get_recipe_buyers(previous['recipe_id']),
+            previous['ingredient_id'], -previous['amount'])
+    change_ingredient_amount(buyers, instance.ingredient_id, instance.amount)
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def remove_shopping_lists_amount(instance, **kwargs):
+    if not signals_suspended.get():
+        change_ingredient_amount(
+            get_recipe_buyers(instance.recipe_id),
+            instance.ingredient_id, -instance.amount)
+
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(instance, created, **kwargs):
+    if created:
+        change_counter(Recipe, instance.recipe_id, 'favorites_count', 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(instance, **kwargs):
+    change_counter(Recipe, instance.recipe_id, 'favorites_count', -1)
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.author_id, 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(instance, **kwargs):
+    change_counter(User, instance.author_id, 'recipes_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+def increment_followers_count(instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.following_id, 'followers_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_followers_count(instance, **kwargs):
+    change_counter(User, instance.following_id, 'followers_count', -1)
+
+
+def repair_search_index(using, **kwargs):
+    repair_index(connections[using])
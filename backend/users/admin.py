@@ -1,12 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from django.db.models import Count
 
+from core.admin import LargeTableAdminMixin
 from .models import Follow, User
 
 
 @admin.register(User)
-class UserAdmin(UserAdmin):
+class UserAdmin(LargeTableAdminMixin, UserAdmin):
     list_display = (
         'username',
         'id',
@@ -16,25 +16,11 @@ class UserAdmin(UserAdmin):
         'recipes_count',
         'followers_count',
     )
-    list_filter = ('email', 'first_name')
-
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        qs = qs.annotate(
-            _recipes_count=Count('recipes', distinct=True),
-            _followers_count=Count('followers', distinct=True)
-        )
-        return qs
-
-    def recipes_count(self, obj):
-        return obj._recipes_count
-    recipes_count.short_description = 'Количество рецептов'
-
-    def followers_count(self, obj):
-        return obj._followers_count
-    followers_count.short_description = 'Количество подписчиков'
+    list_filter = ('is_staff', 'is_active')
 
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'following')
+    list_select_related = ('user', 'following')
+    autocomplete_fields = ('user', 'following')
@@ -4,15 +4,17 @@ from django.core.exceptions import ValidationError
 from django.contrib.auth.models import AbstractUser
 from django.db.models import UniqueConstraint
 
+from core.counters import CountersMixin
 from recipes.constants import (
     EMAIL_LENGTH,
     DEFAULT_LENGTH,
 )
 
 
-class User(AbstractUser):
+class User(CountersMixin, AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ('username', 'first_name', 'last_name')
+    counter_fields = ('recipes_count', 'followers_count')
 
     email = models.EmailField(
         max_length=EMAIL_LENGTH,
@@ -43,6 +45,16 @@ class User(AbstractUser):
         null=True,
         default='default.png'
     )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество рецептов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество подписчиков'
+    )
 
     class Meta:
         ordering = ('first_name', 'last_name')